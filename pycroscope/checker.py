@@ -587,8 +587,6 @@ class Checker:
         cached = self._get_cached_type_object(canonical_key)
         if cached is None:
             cached = TypeObject(self, canonical_key)
-            self.type_object_cache[canonical_key] = cached
-            self.type_object_cache[typ] = cached
         elif isinstance(canonical_key, type) and cached.typ is not canonical_key:
             cached.typ = canonical_key
         self.type_object_cache[canonical_key] = cached
@@ -12,10 +12,10 @@ import enum
 import itertools
 import struct
 import sys
-from collections.abc import Iterable, Iterator, MutableMapping, Sequence
+from collections.abc import Callable, Iterable, Iterator, MutableMapping, Sequence
 from dataclasses import dataclass, replace
 from types import FunctionType, ModuleType
-from typing import Literal, Protocol
+from typing import Literal, Protocol, TypeVar
 
 from typing_extensions import Sentinel, assert_never
 
@@ -37,7 +37,6 @@ from pycroscope.value import (
     CanAssignError,
     ClassKey,
     DictIncompleteValue,
-    Extension,
     GenericValue,
     GradualType,
     InferenceVarValue,
@@ -178,12 +177,39 @@ def _get_relation_cache(ctx: CanAssignContext) -> MutableMapping[object, object]
     return ctx.get_relation_cache()
 
 
-def _relation_key_piece(value: object) -> tuple[str, object]:
+class _HashedKeyPiece:
+    """Relation cache key piece that hashes the wrapped value only once.
+
+    Values are frozen dataclasses whose hashes are recomputed recursively on
+    every call, and each cache key is hashed on lookup, on store, and when
+    checking for recursive relation goals.
+
+    """
+
+    __slots__ = ("value", "hash")
+
+    value: object
+    hash: int
+
+    def __init__(self, value: object, value_hash: int) -> None:
+        self.value = value
+        self.hash = value_hash
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _HashedKeyPiece) or self.hash != other.hash:
+            return False
+        return self.value is other.value or self.value == other.value
+
+
+def _relation_key_piece(value: object) -> object:
     try:
-        hash(value)
+        value_hash = hash(value)
     except Exception:
         return ("id", id(value))
-    return ("val", value)
+    return _HashedKeyPiece(value, value_hash)
 
 
 def _make_relation_cache_key(
@@ -191,9 +217,7 @@ def _make_relation_cache_key(
     right: Value,
     relation: Relation,
     inferables: tuple[TypeParam, ...] | None = None,
-) -> tuple[
-    tuple[str, object], tuple[str, object], Relation, tuple[TypeParam, ...] | None
-]:
+) -> tuple[object, object, Relation, tuple[TypeParam, ...] | None]:
     return (_relation_key_piece(left), _relation_key_piece(right), relation, inferables)
 
 
@@ -224,11 +248,49 @@ def _store_cached_relation_result(
     else:
         # Bounds maps can contain mutable lists of bounds.
         return
+    _store_in_relation_cache(cache, key, cached)
+
+
+def _store_in_relation_cache(
+    cache: MutableMapping[object, object], key: object, cached: object
+) -> None:
     if len(cache) >= _RELATION_CACHE_MAX_SIZE:
         cache.clear()
     cache[key] = cached
 
 
+_DerivedT = TypeVar("_DerivedT")
+_NOT_CACHED = object()
+
+
+def memoize_derived_result(
+    kind: str,
+    value: Value,
+    ctx: CanAssignContext,
+    compute: Callable[[], _DerivedT],
+) -> _DerivedT:
+    """Memoize an immutable result derived from relation checks on ``value``.
+
+    Results share storage, size limit, and invalidation with relation results,
+    and are not cached while relation assumptions are active. ``kind`` must
+    uniquely identify the computation.
+
+    """
+    cache = _get_relation_cache(ctx)
+    if cache is None:
+        return compute()
+    try:
+        key = (kind, _HashedKeyPiece(value, hash(value)))
+    except Exception:
+        return compute()
+    cached = cache.get(key, _NOT_CACHED)
+    if cached is not _NOT_CACHED:
+        return cached
+    result = compute()
+    _store_in_relation_cache(cache, key, result)
+    return result
+
+
 @used
 def is_equivalent(left: Value, right: Value, ctx: CanAssignContext) -> bool:
     """Return whether ``left`` and ``right`` are equivalent types."""
@@ -564,8 +626,10 @@ def _has_relation_impl(
         can_assign = _has_relation(left_inner, right, relation_ctx)
         if isinstance(can_assign, CanAssignError):
             return can_assign
+        if not left._metadata_for_can_assign:
+            return can_assign
         bounds_maps = [can_assign]
-        for ext in left.get_metadata_of_type(Extension):
+        for ext in left._metadata_for_can_assign:
             custom_can_assign = ext.can_assign(right, ctx)
             if isinstance(custom_can_assign, CanAssignError):
                 return custom_can_assign
@@ -578,8 +642,10 @@ def _has_relation_impl(
         )
         if isinstance(can_assign, CanAssignError):
             return can_assign
+        if not right._metadata_for_can_be_assigned:
+            return can_assign
         bounds_maps = [can_assign]
-        for ext in right.get_metadata_of_type(Extension):
+        for ext in right._metadata_for_can_be_assigned:
             custom_can_assign = ext.can_be_assigned(left, ctx)
             if isinstance(custom_can_assign, CanAssignError):
                 return custom_can_assign
@@ -722,6 +788,17 @@ def _has_relation_impl(
         if isinstance(right, MultiValuedValue):
             return _has_relation_union(left, right.vals, relation_ctx)
         else:
+            # Fast path for literals in large unions of literals. A literal is
+            # related to itself with an empty bounds map, and an empty bounds
+            # map in the intersection below makes the result empty too.
+            # Functions are excluded because they are compared by signature.
+            if (
+                isinstance(right, KnownValue)
+                and type(right) is KnownValue
+                and not isinstance(right.val, FunctionType)
+                and left.has_known_member(right)
+            ):
+                return {}
             # right is a subtype if it's a subtype of any of the members
             bounds_maps = []
             errors = []
@@ -13,9 +13,17 @@ from typing_extensions import Protocol, TypeVarTuple, runtime_checkable
 
 from . import tests, value
 from .checker import Checker
+from .error_code import ErrorCode
 from .name_check_visitor import NameCheckVisitor
 from .predicates import MaxLen, MinLen
-from .relations import extract_type_form, intersect_values, is_subtype, subtract_values
+from .relations import (
+    Relation,
+    extract_type_form,
+    has_relation,
+    intersect_values,
+    is_subtype,
+    subtract_values,
+)
 from .signature import ELLIPSIS_PARAM, Signature
 from .stacked_scopes import Composite
 from .test_node_visitor import skip_if_not_installed
@@ -376,6 +384,16 @@ def test_stringify_object_without_module_name() -> None:
     assert value.stringify_object(generated) == "Generated.__init__"
 
 
+def test_stringify_object_after_rename() -> None:
+    class Generated:
+        pass
+
+    assert value.stringify_object(Generated).endswith(".Generated")
+    Generated.__module__ = "renamed"
+    Generated.__qualname__ = "Renamed"
+    assert value.stringify_object(Generated) == "renamed.Renamed"
+
+
 def test_generic_value() -> None:
     val = GenericValue(list, [TypedValue(int)])
     assert "list[int]" == str(val)
@@ -515,13 +533,15 @@ def test_weak_list_is_still_assignable_to_strong_list() -> None:
 
 def test_sequence_value_unpack() -> None:
     fmt_map = {"i": int, "s": str, "b": bool, "o": object}
+    seqs_by_fmt: dict[str, SequenceValue] = {}
 
     def s(fmt: str) -> SequenceValue:
-        members = []
-        for c in fmt:
-            is_many = c.isupper()
-            members.append((is_many, TypedValue(fmt_map[c.lower()])))
-        return SequenceValue(tuple, members)
+        # SequenceValue is immutable, so we can reuse the value for each format.
+        seq = seqs_by_fmt.get(fmt)
+        if seq is None:
+            members = [(c.isupper(), TypedValue(fmt_map[c.lower()])) for c in fmt]
+            seq = seqs_by_fmt[fmt] = SequenceValue(tuple, members)
+        return seq
 
     # left is empty
     assert_can_assign(s(""), s(""))
@@ -616,11 +636,28 @@ def test_multi_valued_value() -> None:
 
 
 def test_large_union_optimization() -> None:
-    val = MultiValuedValue([*[KnownValue(i) for i in range(10000)], TypedValue(str)])
+    members = [*[KnownValue(i) for i in range(10000)], TypedValue(str)]
+    val = MultiValuedValue(members)
+    assert val == value.unite_values(*members, *members)
     assert_can_assign(val, KnownValue(1))
     assert_cannot_assign(val, KnownValue(234234))
     assert_cannot_assign(val, KnownValue(True))
     assert_can_assign(val, KnownValue(""))
+    assert_can_assign(val, KnownValue(1) | KnownValue(9999))
+    assert_cannot_assign(val, KnownValue(1) | KnownValue(True))
+
+
+class _UnhashableLiteral:
+    def __hash__(self) -> int:
+        raise RuntimeError("cannot hash")
+
+
+def test_union_with_unhashable_literal() -> None:
+    val = MultiValuedValue([KnownValue(_UnhashableLiteral()), KnownValue(2)])
+    assert has_relation(val, KnownValue(2), Relation.ASSIGNABLE, CTX) == {}
+    assert isinstance(
+        has_relation(val, KnownValue(1), Relation.ASSIGNABLE, CTX), CanAssignError
+    )
 
 
 class ThriftEnum(object):
@@ -957,6 +994,12 @@ def test_annotated_value() -> None:
     assert_cannot_assign(annotated, union)
     assert_can_assign(union, annotated)
 
+    assert value.annotate_value(annotated, [ext]) is annotated
+    other_ext = TypeIsExtension(TypedValue(str))
+    assert value.annotate_value(annotated, [other_ext, ext]) == AnnotatedValue(
+        union, [ext, other_ext]
+    )
+
 
 class A:
     pass
@@ -1299,6 +1342,17 @@ def test_pickling() -> None:
     _assert_pickling_roundtrip(KnownValue(1))
     _assert_pickling_roundtrip(TypedValue(int))
     _assert_pickling_roundtrip(KnownValue(None) | TypedValue(str))
+    _assert_pickling_roundtrip(
+        value.DictIncompleteValue(
+            dict, [KVPair(KnownValue("a"), TypedValue(int), is_required=False)]
+        )
+    )
+    _assert_pickling_roundtrip(
+        value.TypedDictValue({"a": value.TypedDictEntry(TypedValue(int))})
+    )
+    _assert_pickling_roundtrip(
+        AnnotatedValue(TypedValue(bool), [value.TypeGuardExtension(TypedValue(int))])
+    )
 
 
 def test_unite_and_simplify() -> None:
@@ -1387,6 +1441,16 @@ def test_can_overlap() -> None:
         CanAssignError,
     )
 
+    literals = value.unite_values(*[KnownValue(i) for i in range(100)])
+    for mode in OverlapMode:
+        assert KnownValue(42).can_overlap(literals, CTX, mode) is None
+    assert isinstance(
+        KnownValue(True).can_overlap(literals, CTX, OverlapMode.IS), CanAssignError
+    )
+    unhashable = MultiValuedValue([KnownValue(_UnhashableLiteral()), KnownValue(2)])
+    assert KnownValue(1).can_overlap(unhashable, CTX, OverlapMode.EQ) is None
+    assert KnownValue(2).can_overlap(unhashable, CTX, OverlapMode.IS) is None
+
 
 def test_intersection_can_overlap() -> None:
     min_len_20 = value.PredicateValue(MinLen(20))
@@ -1408,3 +1472,38 @@ def test_predicate_can_overlap_uses_intersection() -> None:
         min_len_20.can_overlap(max_len_10, CTX, OverlapMode.EQ), CanAssignError
     )
     assert not value.is_overlapping(min_len_20, max_len_10, CTX)
+
+
+def test_can_assign_error_code() -> None:
+    code = ErrorCode.incompatible_argument
+    other_code = ErrorCode.incompatible_return_value
+    assert CanAssignError("x").get_error_code() is None
+    assert CanAssignError("x", error_code=code).get_error_code() == code
+    assert (
+        CanAssignError("x", [CanAssignError("y", error_code=code)]).get_error_code()
+        == code
+    )
+    assert (
+        CanAssignError(
+            "x", [CanAssignError("y", error_code=code), CanAssignError("z")]
+        ).get_error_code()
+        is None
+    )
+    assert (
+        CanAssignError(
+            "x", [CanAssignError("y", error_code=code)], error_code=other_code
+        ).get_error_code()
+        is None
+    )
+
+
+def test_can_assign_error_display() -> None:
+    error = CanAssignError(
+        "outer",
+        [
+            CanAssignError("", [CanAssignError("inner\n\nmore")]),
+            CanAssignError("second"),
+        ],
+    )
+    assert error.display() == "  outer\n      inner\n\n      more\n    second\n"
+    assert error.display(depth=0) == "outer\n    inner\n\n    more\n  second\n"
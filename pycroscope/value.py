@@ -43,6 +43,7 @@ from collections.abc import (
 )
 from contextlib import AbstractContextManager
 from dataclasses import InitVar, dataclass, field, replace
+from functools import cached_property, lru_cache
 from itertools import chain
 from types import FunctionType, ModuleType
 from typing import Any, Optional, TypeGuard, TypeVar, Union
@@ -515,6 +516,12 @@ def get_typevar_variance(typevar: TypeVarLike) -> Variance:
 class Value:
     """Base class for all values."""
 
+    # Subclasses may memoize derived data with functools.cached_property (or a
+    # field with compare=False) when it depends only on the value's own fields
+    # and pickles correctly, like frozensets and tuples of Values, which are
+    # rebuilt on unpickling. Hashes and string forms are never cached: str
+    # hashes differ between processes, and __str__ depends on which type
+    # aliases are currently being printed.
     __slots__ = ()
 
     def can_assign(self, other: "Value", ctx: "CanAssignContext") -> "CanAssign":
@@ -640,7 +647,12 @@ class Value:
         return None
 
     def __or__(self, other: "Value") -> "Value":
-        """Shortcut for defining a MultiValuedValue."""
+        """Shortcut for defining a MultiValuedValue.
+
+        Each use rebuilds the union, so prefer :func:`unite_values` when
+        combining many values at once.
+
+        """
         return unite_values(self, other)
 
     def __ror__(self, other: "Value") -> "Value":
@@ -789,22 +801,38 @@ class CanAssignError:
 
     def display(self, depth: int = 2) -> str:
         """Display all errors in a human-readable format."""
-        child_result = "".join(
-            child.display(depth=depth + 2) for child in self.children
-        )
-        if self.message:
-            message = textwrap.indent(self.message, " " * depth)
-            return f"{message}\n{child_result}"
-        else:
-            return child_result
+        pieces: list[str] = []
+        stack = [(self, depth)]
+        while stack:
+            error, error_depth = stack.pop()
+            message = error.message
+            if "\n" in message or message.isspace():
+                # textwrap.indent leaves whitespace-only lines unindented
+                pieces.append(textwrap.indent(message, " " * error_depth))
+                pieces.append("\n")
+            elif message:
+                pieces.append(" " * error_depth)
+                pieces.append(message)
+                pieces.append("\n")
+            stack.extend((child, error_depth + 2) for child in reversed(error.children))
+        return "".join(pieces)
 
     def get_error_code(self) -> Error | None:
-        errors = {child.get_error_code() for child in self.children}
-        if self.error_code:
-            errors.add(self.error_code)
-        if len(errors) == 1:
-            return next(iter(errors))
-        return None
+        """Return the error code shared by this error and all of its children.
+
+        Returns None if there is no code or if the codes disagree.
+
+        """
+        error_code = self.error_code
+        for child in self.children:
+            child_code = child.get_error_code()
+            if child_code is None:
+                return None
+            if error_code is None:
+                error_code = child_code
+            elif child_code != error_code:
+                return None
+        return error_code
 
     def __str__(self) -> str:
         return self.display()
@@ -1577,8 +1605,20 @@ class TypeAliasValue(Value):
     alias: TypeAlias = field(compare=False, hash=False)
     type_arguments: Sequence[Value] = ()
     type_arguments_are_packed: bool = False
+    _value: Value | None = field(
+        default=None, init=False, repr=False, compare=False, hash=False
+    )
+    """Cached result of :meth:`get_value`, set once the alias is evaluated."""
 
     def get_value(self) -> Value:
+        if self._value is not None:
+            return self._value
+        val = self._compute_value()
+        if self.alias.evaluated_value is not None:
+            object.__setattr__(self, "_value", val)
+        return val
+
+    def _compute_value(self) -> Value:
         val = self.alias.get_value()
         type_params = self.alias.get_type_params()
         if self.type_arguments:
@@ -1695,7 +1735,7 @@ class KnownValue(Value):
     """The Python object that this ``KnownValue`` represents."""
 
     def is_type(self, typ: type) -> bool:
-        return safe_isinstance(self.val, typ)
+        return type(self.val) is typ or safe_isinstance(self.val, typ)
 
     def get_type(self) -> type:
         return type(self.val)
@@ -1713,6 +1753,9 @@ class KnownValue(Value):
     ) -> CanAssignError | None:
         if isinstance(other, (SubclassValue, TypedValue)):
             return other.can_overlap(self, ctx, mode)
+        elif isinstance(other, MultiValuedValue) and other.has_known_member(self):
+            # An equal literal overlaps in every mode; skip checking each member.
+            return None
         elif isinstance(other, KnownValue):
             if self.val is other.val:
                 return None
@@ -1736,6 +1779,8 @@ class KnownValue(Value):
         return super().can_overlap(other, ctx, mode)
 
     def __eq__(self, other: Value) -> bool:
+        if self is other:
+            return True
         return (
             isinstance(other, KnownValue)
             and type(self.val) is type(other.val)
@@ -1780,11 +1825,11 @@ class KnownValue(Value):
         return KnownValueWithTypeVars(self.val, typevars)
 
     def simplify(self) -> Value:
+        # don't simplify None
+        if self.val is None:
+            return self
         val = replace_known_sequence_value(self)
         if isinstance(val, KnownValue):
-            # don't simplify None
-            if val.val is None:
-                return self
             return TypedValue(type(val.val))
         return val.simplify()
 
@@ -2140,6 +2185,8 @@ class TypedValue(Value):
         return AnyValue(AnySource.generic_argument)
 
     def is_type(self, typ: type) -> bool:
+        if self.typ is typ:
+            return True
         return isinstance(self.typ, type) and safe_issubclass(self.typ, typ)
 
     def get_type(self) -> type | None:
@@ -2324,7 +2371,7 @@ class SequenceValue(GenericValue):
 
     def __init__(self, typ: ClassKey, members: Sequence[SequenceMember]) -> None:
         if members:
-            args = (unite_values(*[typ for _, typ in members]),)
+            args = (unite_values(*[member for _, member in members]),)
         elif typ is tuple:
             args = (NO_RETURN_VALUE,)
         else:
@@ -2336,12 +2383,19 @@ class SequenceValue(GenericValue):
     def get_member_sequence(self) -> Sequence[Value] | None:
         """Return the :class:`Value` objects in this sequence. Return
         None if there are any unpacked values in the sequence."""
+        members = self._fixed_members
+        if members is None:
+            return None
+        return list(members)
+
+    @cached_property
+    def _fixed_members(self) -> tuple[Value, ...] | None:
         members = []
         for is_many, member in self.members:
             if is_many:
                 return None
             members.append(member)
-        return members
+        return tuple(members)
 
     def make_known_value(self) -> Value:
         """Turn this value into a KnownValue if possible."""
@@ -2365,6 +2419,8 @@ class SequenceValue(GenericValue):
             return SequenceValue(typ, members)
 
     def substitute_typevars(self, typevars: TypeVarMap) -> "SequenceValue":
+        if not typevars:
+            return self
         new_members: list[SequenceMember] = []
         for is_many, member in self.members:
             substituted = member.substitute_typevars(typevars)
@@ -2446,7 +2502,7 @@ class SequenceValue(GenericValue):
             return None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class KVPair:
     """Represents a single entry in a :class:`DictIncompleteValue`."""
 
@@ -2490,8 +2546,13 @@ class DictIncompleteValue(GenericValue):
 
     def __init__(self, typ: ClassKey, kv_pairs: Sequence[KVPair]) -> None:
         if kv_pairs:
-            key_type = unite_values(*[pair.key for pair in kv_pairs])
-            value_type = unite_values(*[pair.value for pair in kv_pairs])
+            keys = []
+            values = []
+            for pair in kv_pairs:
+                keys.append(pair.key)
+                values.append(pair.value)
+            key_type = unite_values(*keys)
+            value_type = unite_values(*values)
         else:
             key_type = value_type = AnyValue(AnySource.unreachable)
         super().__init__(typ, (key_type, value_type), weak=True)
@@ -2508,6 +2569,8 @@ class DictIncompleteValue(GenericValue):
             yield from pair.value.walk_values()
 
     def substitute_typevars(self, typevars: TypeVarMap) -> "DictIncompleteValue":
+        if not typevars:
+            return self
         return DictIncompleteValue(
             self.typ, [pair.substitute_typevars(typevars) for pair in self.kv_pairs]
         )
@@ -2549,7 +2612,7 @@ class DictIncompleteValue(GenericValue):
         return unite_values(*possible_values)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TypedDictEntry:
     typ: Value
     required: bool = True
@@ -2582,18 +2645,14 @@ class TypedDictValue(GenericValue):
         extra_keys: Value | None = None,
         extra_keys_readonly: bool = False,
     ) -> None:
-        # Compatibility with old format, where values were (required, type) tuples.
-        items = {
-            key: (
-                value
-                if isinstance(value, TypedDictEntry)
-                else TypedDictEntry(value[1], required=value[0])
-            )
-            for key, value in items.items()
-        }
+        normalized_items = {}
         value_types = []
-        if items:
-            value_types += [val.typ for val in items.values()]
+        for key, entry in items.items():
+            if not isinstance(entry, TypedDictEntry):
+                # Compatibility with the old format of (required, type) tuples.
+                entry = TypedDictEntry(entry[1], required=entry[0])
+            normalized_items[key] = entry
+            value_types.append(entry.typ)
         if extra_keys is not None:
             value_types.append(extra_keys)
         value_type = (
@@ -2604,7 +2663,7 @@ class TypedDictValue(GenericValue):
         # The key type must be str so dict[str, Any] is compatible with a TypedDict
         key_type = TypedValue(str)
         super().__init__(dict, (key_type, value_type))
-        self.items = items
+        self.items = normalized_items
         self.extra_keys = extra_keys
         self.extra_keys_readonly = extra_keys_readonly
 
@@ -2654,6 +2713,8 @@ class TypedDictValue(GenericValue):
         return super().can_overlap(other, ctx, mode)
 
     def substitute_typevars(self, typevars: TypeVarMap) -> "TypedDictValue":
+        if not typevars:
+            return self
         return TypedDictValue(
             {
                 key: TypedDictEntry(
@@ -2682,7 +2743,7 @@ class TypedDictValue(GenericValue):
         return f"TypedDict({{{', '.join(items)}}}{closed})"
 
     def __hash__(self) -> int:
-        return hash(tuple(sorted(self.items)))
+        return hash(frozenset(self.items))
 
     def walk_values(self) -> Iterable["Value"]:
         yield self
@@ -2736,6 +2797,8 @@ class AsyncTaskIncompleteValue(GenericValue):
         self.value = value
 
     def substitute_typevars(self, typevars: TypeVarMap) -> "AsyncTaskIncompleteValue":
+        if not typevars:
+            return self
         return AsyncTaskIncompleteValue(
             self.typ, self.value.substitute_typevars(typevars)
         )
@@ -3049,11 +3112,14 @@ class MultiValuedValue(Value):
     """The underlying values of the union."""
 
     def __post_init__(self, raw_vals: Iterable[Value]) -> None:
-        object.__setattr__(
-            self,
-            "vals",
-            tuple(chain.from_iterable(flatten_values(val) for val in raw_vals)),
-        )
+        vals = []
+        for val in raw_vals:
+            # Only unions need flattening; avoid a generator for other members.
+            if isinstance(val, (MultiValuedValue, AnnotatedValue)):
+                vals.extend(flatten_values(val))
+            else:
+                vals.append(val)
+        object.__setattr__(self, "vals", tuple(vals))
 
     def substitute_typevars(self, typevars: TypeVarMap) -> Value:
         if not self.vals or not typevars:
@@ -3083,6 +3149,34 @@ class MultiValuedValue(Value):
     def decompose(self) -> Iterable[Value]:
         return self.vals
 
+    @cached_property
+    def _known_vals(self) -> frozenset["KnownValue"] | None:
+        # Used to quickly check whether a literal is a member of a large union
+        # of literals without checking each member in turn.
+        try:
+            return frozenset(
+                val
+                for val in self.vals
+                if isinstance(val, KnownValue) and type(val) is KnownValue
+            )
+        except Exception:
+            return None
+
+    def has_known_member(self, val: "KnownValue") -> bool:
+        """Return whether this union directly contains the given literal.
+
+        A False result does not imply that the literal is not compatible with
+        the union.
+
+        """
+        known_vals = self._known_vals
+        if known_vals is None:
+            return False
+        try:
+            return val in known_vals
+        except Exception:
+            return False
+
     def __eq__(self, other: Value) -> bool:
         if not isinstance(other, MultiValuedValue):
             return NotImplemented
@@ -3090,13 +3184,19 @@ class MultiValuedValue(Value):
             return True
         # try to put the values in a set so different objects that happen to have different order
         # compare equal, but don't worry if some aren't hashable
-        try:
-            left_vals = set(self.vals)
-            right_vals = set(other.vals)
-        except Exception:
+        left_vals = self._val_set
+        right_vals = other._val_set
+        if left_vals is None or right_vals is None:
             return False
         return left_vals == right_vals
 
+    @cached_property
+    def _val_set(self) -> frozenset[Value] | None:
+        try:
+            return frozenset(self.vals)
+        except Exception:
+            return None
+
     def __ne__(self, other: Value) -> bool:
         return not (self == other)
 
@@ -3107,10 +3207,11 @@ class MultiValuedValue(Value):
         has_none = False
         others: list[Value] = []
         for val in self.vals:
-            if val == KnownValue(None):
-                has_none = True
-            elif isinstance(val, KnownValue):
-                literals.append(val)
+            if isinstance(val, KnownValue):
+                if val.val is None:
+                    has_none = True
+                else:
+                    literals.append(val)
             else:
                 others.append(val)
         if not others:
@@ -3397,7 +3498,7 @@ class Extension:
         return {}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SelfOwnerExtension(Extension):
     class_key: ClassKey
 
@@ -3405,7 +3506,7 @@ class SelfOwnerExtension(Extension):
         return f"SelfOwner[{self.class_key}]"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CustomCheckExtension(Extension):
     custom_check: CustomCheck
 
@@ -3426,7 +3527,7 @@ class CustomCheckExtension(Extension):
         return self.custom_check.can_be_assigned(value, ctx)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParameterTypeGuardExtension(Extension):
     """An :class:`Extension` used in a function return type. Used to
     indicate that the parameter named `varname` is of type `guarded_type`.
@@ -3446,7 +3547,7 @@ class ParameterTypeGuardExtension(Extension):
         yield from self.guarded_type.walk_values()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class NoReturnGuardExtension(Extension):
     """An :class:`Extension` used in a function return type. Used to
     indicate that unless the parameter named `varname` is of type `guarded_type`,
@@ -3467,7 +3568,7 @@ class NoReturnGuardExtension(Extension):
         yield from self.guarded_type.walk_values()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TypeGuardExtension(Extension):
     """An :class:`Extension` used in a function return type. Used to
     indicate that the first function argument is of type `guarded_type`.
@@ -3488,7 +3589,7 @@ class TypeGuardExtension(Extension):
     def can_assign(self, value: Value, ctx: CanAssignContext) -> CanAssign:
         can_assign_maps = []
         if isinstance(value, AnnotatedValue):
-            for ext in value.get_metadata_of_type(Extension):
+            for ext in value.metadata:
                 if isinstance(ext, TypeIsExtension):
                     return CanAssignError("TypeGuard is not compatible with TypeIs")
                 elif isinstance(ext, TypeGuardExtension):
@@ -3507,7 +3608,7 @@ class TypeGuardExtension(Extension):
         return unify_bounds_maps(can_assign_maps)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TypeIsExtension(Extension):
     """An :class:`Extension` used in a function return type. Used to
     indicate that the first function argument may be narrowed to type `guarded_type`.
@@ -3528,7 +3629,7 @@ class TypeIsExtension(Extension):
     def can_assign(self, value: Value, ctx: CanAssignContext) -> CanAssign:
         can_assign_maps = []
         if isinstance(value, AnnotatedValue):
-            for ext in value.get_metadata_of_type(Extension):
+            for ext in value.metadata:
                 if isinstance(ext, TypeGuardExtension):
                     return CanAssignError("TypeGuard is not compatible with TypeIs")
                 elif isinstance(ext, TypeIsExtension):
@@ -3609,7 +3710,7 @@ class SyntheticTypeFormValue(Value):
         return f"TypeForm[{self.inner_type}] (synthetic from {self.runtime_type})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AddPredicateExtension(Extension):
     """An :class:`Extension` used in a function return type. Used to
     indicate that the function argument named `varname` should receive
@@ -3629,7 +3730,7 @@ class AddPredicateExtension(Extension):
         yield from self.predicate.walk_values()
 
 
-@dataclass(frozen=True, eq=False)
+@dataclass(frozen=True, slots=True, eq=False)
 class ConstraintExtension(Extension):
     """Encapsulates a Constraint. If the value is evaluated and is truthy, the
     constraint must be True."""
@@ -3644,7 +3745,7 @@ class ConstraintExtension(Extension):
         return str(self.constraint)
 
 
-@dataclass(frozen=True, eq=False)
+@dataclass(frozen=True, slots=True, eq=False)
 class NoReturnConstraintExtension(Extension):
     """Encapsulates a Constraint. If the value is evaluated and completes, the
     constraint must be True."""
@@ -3656,7 +3757,7 @@ class NoReturnConstraintExtension(Extension):
         return id(self)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AlwaysPresentExtension(Extension):
     """Extension that indicates that an iterable value is nonempty.
 
@@ -3665,24 +3766,24 @@ class AlwaysPresentExtension(Extension):
     """
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AssertErrorExtension(Extension):
     """Used for the implementation of :func:`pycroscope.extensions.assert_error`."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SkipDeprecatedExtension(Extension):
     """Indicates that use of this value should not trigger deprecation errors."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DeprecatedExtension(Extension):
     """Indicates that use of this value should trigger a deprecation error."""
 
     deprecation_message: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SysPlatformExtension(Extension):
     """Used for sys.platform."""
 
@@ -3690,7 +3791,7 @@ class SysPlatformExtension(Extension):
 SYS_PLATFORM_EXTENSION = SysPlatformExtension()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SysVersionInfoExtension(Extension):
     """Used for sys.version_info."""
 
@@ -3698,7 +3799,7 @@ class SysVersionInfoExtension(Extension):
 SYS_VERSION_INFO_EXTENSION = SysVersionInfoExtension()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DefiniteValueExtension(Extension):
     """Used if a comparison has a definite value that should be used
     to skip type checking."""
@@ -3796,7 +3897,7 @@ class PropertyInfo:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DataclassTransformExtension(Extension):
     info: DataclassTransformInfo
 
@@ -3807,7 +3908,7 @@ class DataclassTransformExtension(Extension):
         yield from self.info.walk_values()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DataclassTransformDecoratorExtension(Extension):
     info: DataclassTransformInfo
 
@@ -3848,8 +3949,13 @@ class AnnotatedValue(Value):
         return self.value.get_type_value(ctx)
 
     def substitute_typevars(self, typevars: TypeVarMap) -> Value:
+        value = self.value.substitute_typevars(typevars)
         metadata = tuple(val.substitute_typevars(typevars) for val in self.metadata)
-        return AnnotatedValue(self.value.substitute_typevars(typevars), metadata)
+        if value is self.value and all(
+            new is old for new, old in zip(metadata, self.metadata)
+        ):
+            return self
+        return AnnotatedValue(value, metadata)
 
     def can_overlap(
         self, other: Value, ctx: CanAssignContext, mode: OverlapMode
@@ -3878,6 +3984,28 @@ class AnnotatedValue(Value):
         """Return whether there is metadata of the given type."""
         return any(isinstance(data, typ) for data in self.metadata)
 
+    @cached_property
+    def _metadata_for_can_assign(self) -> tuple[Extension, ...]:
+        # Extensions that override Extension.can_assign; the others never
+        # restrict what can be assigned to this value.
+        return tuple(
+            data
+            for data in self.metadata
+            if isinstance(data, Extension)
+            and type(data).can_assign is not Extension.can_assign
+        )
+
+    @cached_property
+    def _metadata_for_can_be_assigned(self) -> tuple[Extension, ...]:
+        # Extensions that override Extension.can_be_assigned; the others never
+        # restrict what this value can be assigned to.
+        return tuple(
+            data
+            for data in self.metadata
+            if isinstance(data, Extension)
+            and type(data).can_be_assigned is not Extension.can_be_assigned
+        )
+
     def __str__(self) -> str:
         return f"Annotated[{self.value}, {', '.join(map(str, self.metadata))}]"
 
@@ -3928,10 +4056,13 @@ class VariableNameValue(AnyValue):
         If there is no VariableNameValue that corresponds to the variable name, returns None.
 
         """
+        if not varname_map:
+            return None
         if varname in varname_map:
             return varname_map[varname]
         if "_" in varname:
-            parts = varname.split("_")
+            # Only the last two components can matter.
+            parts = varname.rsplit("_", 2)
             if parts[-1] == "id":
                 shortened_varname = "_".join(parts[-2:])
             else:
@@ -4165,10 +4296,17 @@ def unify_bounds_maps(bounds_maps: Sequence[BoundsMap]) -> BoundsMap:
 
 
 def intersect_bounds_maps(bounds_maps: Sequence[BoundsMap]) -> BoundsMap:
+    if not bounds_maps:
+        return {}
+    # Only TypeVars bound in every map survive, so skip collecting the others.
+    common = set(bounds_maps[0]).intersection(*bounds_maps[1:])
+    if not common:
+        return {}
     intermediate: dict[TypeParam, set[tuple[Bound, ...]]] = {}
     for bounds_map in bounds_maps:
         for tv, bounds in bounds_map.items():
-            intermediate.setdefault(tv, set()).add(tuple(bounds))
+            if tv in common:
+                intermediate.setdefault(tv, set()).add(tuple(bounds))
     return {
         tv: (
             [OrBound(tuple(bound_lists))]
@@ -4176,7 +4314,6 @@ def intersect_bounds_maps(bounds_maps: Sequence[BoundsMap]) -> BoundsMap:
             else next(iter(bound_lists))
         )
         for tv, bound_lists in intermediate.items()
-        if all(tv in bounds_map for bounds_map in bounds_maps)
     }
 
 
@@ -4184,6 +4321,9 @@ def annotate_value(origin: Value, metadata: Sequence[Extension]) -> Value:
     if not metadata:
         return origin
     if isinstance(origin, AnnotatedValue):
+        if all(item in origin.metadata for item in metadata):
+            # Nothing new to add
+            return origin
         # Flatten it
         metadata = (*origin.metadata, *metadata)
         origin = origin.value
@@ -4210,15 +4350,14 @@ def unannotate_value(
 ) -> tuple[Value, Sequence[ExtensionT]]:
     if not isinstance(origin, AnnotatedValue):
         return origin, []
-    matches = [
-        metadata for metadata in origin.metadata if isinstance(metadata, extension)
-    ]
+    matches: list[ExtensionT] = []
+    remaining: list[Extension] = []
+    for metadata in origin.metadata:
+        if isinstance(metadata, extension):
+            matches.append(metadata)
+        else:
+            remaining.append(metadata)
     if matches:
-        remaining = [
-            metadata
-            for metadata in origin.metadata
-            if not isinstance(metadata, extension)
-        ]
         return annotate_value(origin.value, remaining), matches
     return origin, []
 
@@ -4282,12 +4421,27 @@ def unite_values(*values: Value) -> Value:
     """
     if not values:
         return NO_RETURN_VALUE
+    if len(values) == 1:
+        # Fast path for the most common case; repeated values are skipped below.
+        value = values[0]
+        if (
+            isinstance(value, Value)
+            and not isinstance(value, (MultiValuedValue, AnnotatedValue))
+            and not _is_unreachable(value)
+        ):
+            return value
     # Make sure order is consistent; conceptually this is a set but
     # sets have unpredictable iteration order.
     hashable_vals = {}
     unhashable_vals = []
+    # Inputs often repeat the same object; skip those before hashing them.
+    seen_ids = set()
     for value in values:
         assert isinstance(value, Value), repr(value)
+        value_id = id(value)
+        if value_id in seen_ids:
+            continue
+        seen_ids.add(value_id)
         if isinstance(value, MultiValuedValue):
             subvals = value.vals
         elif isinstance(value, AnnotatedValue) and isinstance(
@@ -4305,16 +4459,18 @@ def unite_values(*values: Value) -> Value:
                     hashable_vals[subval] = None
             except Exception:
                 unhashable_vals.append(subval)
-    existing = list(hashable_vals) + unhashable_vals
-    reachabilities = [_is_unreachable(val) for val in existing]
-    num_unreachable = sum(reachabilities)
-    num = len(existing) - num_unreachable
+    existing = []
+    num_unreachable = 0
+    for val in chain(hashable_vals, unhashable_vals):
+        if _is_unreachable(val):
+            num_unreachable += 1
+        else:
+            existing.append(val)
+    num = len(existing)
     if num == 0:
         if num_unreachable:
             return AnyValue(AnySource.unreachable)
         return NO_RETURN_VALUE
-    if num_unreachable:
-        existing = [val for i, val in enumerate(existing) if not reachabilities[i]]
     if _has_exact_complement(existing):
         return TypedValue(object)
     if num == 1:
@@ -4374,6 +4530,13 @@ def len_of_value(val: Value) -> Value:
     return TypedValue(int)
 
 
+@lru_cache(maxsize=4096)
+def _known_element(elt: str | int) -> KnownValue:
+    # Elements of str, bytes, and range literals repeat heavily, and KnownValue
+    # is immutable, so share a single instance per element.
+    return KnownValue(elt)
+
+
 def concrete_values_from_iterable(
     value: Value, ctx: CanAssignContext
 ) -> CanAssignError | Value | Sequence[Value]:
@@ -4398,18 +4561,21 @@ def concrete_values_from_iterable(
     if value is NO_RETURN_VALUE:
         return NO_RETURN_VALUE
     elif isinstance(value, MultiValuedValue):
-        subvals = [concrete_values_from_iterable(val, ctx) for val in value.vals]
-        errors = [subval for subval in subvals if isinstance(subval, CanAssignError)]
+        errors: list[CanAssignError] = []
+        value_subvals: list[Value] = []
+        seq_subvals: list[Sequence[Value]] = []
+        for val in value.vals:
+            subval = concrete_values_from_iterable(val, ctx)
+            if isinstance(subval, CanAssignError):
+                errors.append(subval)
+            elif isinstance(subval, Value):
+                value_subvals.append(subval)
+            else:
+                seq_subvals.append(subval)
         if errors:
             return CanAssignError(
                 "At least one member of Union is not iterable", errors
             )
-        value_subvals = [subval for subval in subvals if isinstance(subval, Value)]
-        seq_subvals = [
-            subval
-            for subval in subvals
-            if not isinstance(subval, (Value, CanAssignError))
-        ]
         if not value_subvals and len(set(map(len, seq_subvals))) == 1:
             return [unite_values(*vals) for vals in zip(*seq_subvals)]
         return unite_values(*value_subvals, *chain.from_iterable(seq_subvals))
@@ -4433,7 +4599,7 @@ def concrete_values_from_iterable(
     elif isinstance(value, KnownValue):
         if isinstance(value.val, (str, bytes, range)):
             if len(value.val) < ITERATION_LIMIT:
-                return [KnownValue(c) for c in value.val]
+                return [_known_element(c) for c in value.val]
             is_nonempty = True
         if (
             sys.version_info >= (3, 11)
@@ -4506,22 +4672,30 @@ def kv_pairs_from_mapping(
 ) -> Sequence[KVPair] | CanAssignError:
     """Return the :class:`KVPair` objects that can be extracted from this value,
     or a :class:`CanAssignError` on error."""
-    value_val = replace_known_sequence_value(value_val)
-    # Special case: if we have a Union including an empty dict, just get the
-    # pairs from the rest of the union and make them all non-required.
-    if isinstance(value_val, MultiValuedValue):
-        subvals = [replace_known_sequence_value(subval) for subval in value_val.vals]
-        if any(subval in EMPTY_DICTS for subval in subvals):
-            other_val = unite_values(
-                *[subval for subval in subvals if subval not in EMPTY_DICTS]
-            )
-            pairs = kv_pairs_from_mapping(other_val, ctx)
-            if isinstance(pairs, CanAssignError):
-                return pairs
-            return [
-                KVPair(pair.key, pair.value, pair.is_many, is_required=False)
-                for pair in pairs
-            ]
+    # The concrete dict types are by far the most common inputs and need no
+    # normalization, so check for them first.
+    if not isinstance(value_val, (DictIncompleteValue, TypedDictValue)):
+        value_val = replace_known_sequence_value(value_val)
+        # Special case: if we have a Union including an empty dict, just get the
+        # pairs from the rest of the union and make them all non-required.
+        if isinstance(value_val, MultiValuedValue):
+            has_empty_dict = False
+            non_empty_subvals = []
+            for subval in value_val.vals:
+                subval = replace_known_sequence_value(subval)
+                if subval in EMPTY_DICTS:
+                    has_empty_dict = True
+                else:
+                    non_empty_subvals.append(subval)
+            if has_empty_dict:
+                other_val = unite_values(*non_empty_subvals)
+                pairs = kv_pairs_from_mapping(other_val, ctx)
+                if isinstance(pairs, CanAssignError):
+                    return pairs
+                return [
+                    KVPair(pair.key, pair.value, pair.is_many, is_required=False)
+                    for pair in pairs
+                ]
     if isinstance(value_val, DictIncompleteValue):
         return value_val.kv_pairs
     elif isinstance(value_val, TypedDictValue):
@@ -4545,24 +4719,38 @@ def kv_pairs_from_mapping(
             )
         return pairs
     else:
-        # Ideally we should only need to check ProtocolMappingValue, but if
-        # we do that we can't infer the right types for dict, so try the
-        # nominal Mapping first.
-        can_assign = get_tv_map(NominalMappingValue, value_val, ctx)
-        if isinstance(can_assign, CanAssignError):
-            can_assign = get_tv_map(ProtocolMappingValue, value_val, ctx)
-            if isinstance(can_assign, CanAssignError):
-                return can_assign
-        key_type = can_assign.get_typevar(
-            TypeVarParam(K, owner=None), AnyValue(AnySource.generic_argument)
-        )
-        value_type = can_assign.get_typevar(
-            TypeVarParam(V, owner=None),
-            can_assign.get_typevar(
-                TypeVarParam(V_co, owner=None), AnyValue(AnySource.generic_argument)
-            ),
+        result = pycroscope.relations.memoize_derived_result(
+            "kv_pairs_from_mapping",
+            value_val,
+            ctx,
+            lambda: _mapping_pair_from_protocol(value_val, ctx),
         )
-        return [KVPair(key_type, value_type, is_many=True)]
+        if isinstance(result, CanAssignError):
+            return result
+        return [result]
+
+
+def _mapping_pair_from_protocol(
+    value_val: Value, ctx: CanAssignContext
+) -> KVPair | CanAssignError:
+    # Ideally we should only need to check ProtocolMappingValue, but if
+    # we do that we can't infer the right types for dict, so try the
+    # nominal Mapping first.
+    can_assign = get_tv_map(NominalMappingValue, value_val, ctx)
+    if isinstance(can_assign, CanAssignError):
+        can_assign = get_tv_map(ProtocolMappingValue, value_val, ctx)
+        if isinstance(can_assign, CanAssignError):
+            return can_assign
+    key_type = can_assign.get_typevar(
+        TypeVarParam(K, owner=None), AnyValue(AnySource.generic_argument)
+    )
+    value_type = can_assign.get_typevar(
+        TypeVarParam(V, owner=None),
+        can_assign.get_typevar(
+            TypeVarParam(V_co, owner=None), AnyValue(AnySource.generic_argument)
+        ),
+    )
+    return KVPair(key_type, value_type, is_many=True)
 
 
 def unpack_values(
@@ -4583,25 +4771,17 @@ def unpack_values(
     if isinstance(value, TypeAliasValue):
         value = value.get_value()
     if isinstance(value, MultiValuedValue):
-        subvals = [
-            unpack_values(val, ctx, target_length, post_starred_length)
-            for val in value.vals
-        ]
+        if not value.vals:
+            return _create_unpacked_list(
+                AnyValue(AnySource.unreachable), target_length, post_starred_length
+            )
         good_subvals = []
-        for subval in subvals:
+        for val in value.vals:
+            # Stop at the first member that cannot be unpacked.
+            subval = unpack_values(val, ctx, target_length, post_starred_length)
             if isinstance(subval, CanAssignError):
                 return CanAssignError(f"Cannot unpack {value}", [subval])
             good_subvals.append(subval)
-        if not good_subvals:
-            return _create_unpacked_list(
-                (
-                    AnyValue(AnySource.error)
-                    if subvals
-                    else AnyValue(AnySource.unreachable)
-                ),
-                target_length,
-                post_starred_length,
-            )
         return [unite_values(*vals) for vals in zip(*good_subvals)]
     value = replace_known_sequence_value(value)
     if (tuple_members := tuple_members_from_value(value, ctx)) is not None:
@@ -4639,6 +4819,14 @@ def unpack_values(
 
 def is_iterable(value: Value, ctx: CanAssignContext) -> CanAssignError | Value:
     """Check whether a value is iterable."""
+    return pycroscope.relations.memoize_derived_result(
+        "is_iterable", value, ctx, lambda: _is_iterable_uncached(value, ctx)
+    )
+
+
+def _is_iterable_uncached(
+    value: Value, ctx: CanAssignContext
+) -> CanAssignError | Value:
     tv_map = get_tv_map(IterableValue, value, ctx)
     if isinstance(tv_map, CanAssignError):
         return tv_map
@@ -4689,6 +4877,14 @@ def tuple_members_from_value(
 
 def is_async_iterable(value: Value, ctx: CanAssignContext) -> CanAssignError | Value:
     """Check whether a value is an async iterable."""
+    return pycroscope.relations.memoize_derived_result(
+        "is_async_iterable", value, ctx, lambda: _is_async_iterable_uncached(value, ctx)
+    )
+
+
+def _is_async_iterable_uncached(
+    value: Value, ctx: CanAssignContext
+) -> CanAssignError | Value:
     tv_map = get_tv_map(AsyncIterableValue, value, ctx)
     if isinstance(tv_map, CanAssignError):
         return tv_map
@@ -4711,61 +4907,61 @@ def _create_unpacked_list(
 def _unpack_sequence_value(
     value: SequenceValue, target_length: int, post_starred_length: int | None
 ) -> Sequence[Value] | CanAssignError:
+    members = value.members
+    num_members = len(members)
     head = []
-    tail = []
-    while len(head) < target_length:
-        if len(head) >= len(value.members):
+    for i in range(target_length):
+        if i >= num_members:
             return CanAssignError(
                 f"{value} must have at least {target_length} elements"
             )
-        is_many, val = value.members[len(head)]
+        is_many, val = members[i]
         if is_many:
             break
         head.append(val)
-    remaining_target_length = target_length - len(head)
+    head_length = len(head)
+    remaining_target_length = target_length - head_length
+    # Index of the last member not yet consumed by the tail
+    tail_index = num_members - 1
+    tail = []
     if post_starred_length is None:
         if remaining_target_length == 0:
-            if all(is_many for is_many, _ in value.members[target_length:]):
+            if all(is_many for is_many, _ in members[target_length:]):
                 return head
             return CanAssignError(f"{value} must have exactly {target_length} elements")
 
-        tail = []
-        while len(tail) < remaining_target_length:
-            if len(tail) + len(head) >= len(value.members):
+        for _ in range(remaining_target_length):
+            if tail_index < head_length:
                 return CanAssignError(
                     f"{value} must have at least {target_length} elements"
                 )
-            is_many, val = value.members[-len(tail) - 1]
+            is_many, val = members[tail_index]
             if is_many:
                 break
             tail.append(val)
+            tail_index -= 1
 
-        if tail:
-            remaining_members = value.members[len(head) : -len(tail)]
-        else:
-            remaining_members = value.members[len(head) :]
+        remaining_members = members[head_length : tail_index + 1]
         if not remaining_members:
             return CanAssignError(f"{value} must have exactly {target_length} elements")
         middle_length = remaining_target_length - len(tail)
         fallback_value = unite_values(*[val for _, val in remaining_members])
-        return [*head, *[fallback_value for _ in range(middle_length)], *reversed(tail)]
+        return [*head, *([fallback_value] * middle_length), *reversed(tail)]
     else:
-        while len(tail) < post_starred_length:
-            if len(tail) >= len(value.members) - len(head):
+        for _ in range(post_starred_length):
+            if tail_index < head_length:
                 return CanAssignError(
                     f"{value} must have at least"
                     f" {target_length + post_starred_length} elements"
                 )
-            is_many, val = value.members[-len(tail) - 1]
+            is_many, val = members[tail_index]
             if is_many:
                 break
             tail.append(val)
+            tail_index -= 1
         remaining_post_starred_length = post_starred_length - len(tail)
 
-        if tail:
-            remaining_members = value.members[len(head) : -len(tail)]
-        else:
-            remaining_members = value.members[len(head) :]
+        remaining_members = members[head_length : tail_index + 1]
         if remaining_target_length != 0 or remaining_post_starred_length != 0:
             if not remaining_members:
                 return CanAssignError(
@@ -4776,9 +4972,9 @@ def _unpack_sequence_value(
                 fallback_value = unite_values(*[val for _, val in remaining_members])
                 return [
                     *head,
-                    *[fallback_value for _ in range(remaining_target_length)],
+                    *([fallback_value] * remaining_target_length),
                     GenericValue(list, [fallback_value]),
-                    *[fallback_value for _ in range(remaining_post_starred_length)],
+                    *([fallback_value] * remaining_post_starred_length),
                     *reversed(tail),
                 ]
         else:
@@ -4802,15 +4998,31 @@ def replace_known_sequence_value(
       SequenceValue or DictIncompleteValue.
 
     """
+    if (
+        isinstance(value, TypedValue)
+        and type(value) in _UNCHANGED_BY_REPLACE_KNOWN_SEQUENCE
+    ):
+        return value
     value = replace_fallback(value)
     if isinstance(value, KnownValue):
         return typify_literal(value, ctx)
     return value
 
 
+# Common exact types that replace_known_sequence_value() returns unchanged; all
+# are TypedValue subclasses.
+_UNCHANGED_BY_REPLACE_KNOWN_SEQUENCE = frozenset(
+    {TypedValue, GenericValue, SequenceValue, DictIncompleteValue}
+)
+# Common literal types that typify_literal() returns unchanged.
+_SCALAR_LITERAL_TYPES = frozenset({int, str, bytes, bool, type(None)})
+
+
 def typify_literal(
     value: KnownValue, ctx: CanAssignContext | None = None
 ) -> KnownValue | TypedValue:
+    if type(value.val) in _SCALAR_LITERAL_TYPES:
+        return value
     if isinstance(value.val, tuple):
         if type(value.val) is tuple:
             return SequenceValue(tuple, [(False, KnownValue(elt)) for elt in value.val])
@@ -4865,20 +5077,34 @@ def _deliteral(value: Value) -> Value:
 
 def is_overlapping(left: Value, right: Value, ctx: CanAssignContext) -> bool:
     # Fairly permissive checks for now; possibly this can be tightened up later.
-    left = _deliteral(left)
-    right = _deliteral(right)
+    return _is_overlapping_deliteraled(_deliteral(left), _deliteral(right), ctx)
+
+
+def _is_overlapping_deliteraled(
+    left: Value, right: Value, ctx: CanAssignContext
+) -> bool:
+    # Both operands have already been passed through _deliteral(), so only
+    # members of unions and intersections need to be converted.
     if isinstance(left, MultiValuedValue):
         return not left.vals or any(
-            is_overlapping(val, right, ctx) for val in left.vals
+            _is_overlapping_deliteraled(_deliteral(val), right, ctx)
+            for val in left.vals
         )
     if isinstance(right, MultiValuedValue):
         return not right.vals or any(
-            is_overlapping(left, val, ctx) for val in right.vals
+            _is_overlapping_deliteraled(left, _deliteral(val), ctx)
+            for val in right.vals
         )
     if isinstance(left, IntersectionValue):
-        return all(is_overlapping(val, right, ctx) for val in left.vals)
+        return all(
+            _is_overlapping_deliteraled(_deliteral(val), right, ctx)
+            for val in left.vals
+        )
     if isinstance(right, IntersectionValue):
-        return all(is_overlapping(left, val, ctx) for val in right.vals)
+        return all(
+            _is_overlapping_deliteraled(left, _deliteral(val), ctx)
+            for val in right.vals
+        )
     if isinstance(left, PredicateValue):
         inters = left.predicate.intersect_with(gradualize(right), ctx)
         return inters is not NO_RETURN_VALUE
@@ -5038,7 +5264,7 @@ def is_property_initializer(value: Value) -> bool:
     )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AnnotationExpr:
     ctx: "pycroscope.annotations.Context"
     _value: Value | None
@@ -5059,6 +5285,8 @@ class AnnotationExpr:
         self, metadata: tuple[Sequence[Value], Sequence[Extension]]
     ) -> "AnnotationExpr":
         new_intersects, new_extensions = metadata
+        if not new_intersects and not new_extensions:
+            return self
         if new_intersects:
             if self._value:
                 new_value = IntersectionValue((self._value, *new_intersects))
@@ -5131,6 +5359,11 @@ class AnnotationExpr:
         mutually_exclusive_qualifiers: Collection[Collection[Qualifier]] = (),
         qualifier_error_code: Error = ErrorCode.invalid_qualifier,
     ) -> tuple[Value | None, set[Qualifier]]:
+        if not self.qualifiers:
+            # Common case: no qualifiers, so there is nothing to validate.
+            if self._value is not None and self.metadata:
+                return annotate_value(self._value, self.metadata), set()
+            return self._value, set()
         qualifiers = set()
         qualifier_counts: dict[Qualifier, int] = {}
         qualifier_nodes: dict[Qualifier, ast.AST | None] = {}